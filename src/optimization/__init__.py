@@ -22,5 +22,31 @@ __version__ = "0.1.0"
 __author__ = "Railway Optimization Team"
 
 # Module-level constants
-SUPPORTED_SOLVERS = ["glpk", "cbc", "gurobi", "cplex"]
+SUPPORTED_SOLVERS = ["glpk", "appsi_highs", "cbc", "gurobi", "cplex"]
 DEFAULT_SOLVER = "glpk"
+
+
+def make_solver():
+    """
+    Return a persistent in-memory HiGHS solver, falling back to GLPK.
+    
+    The APPSI structural update checks are disabled: callers build a model
+    with a fixed structure once and only change mutable Params between solves,
+    so each re-solve just pushes the new Param values into HiGHS.
+    """
+    
+    from pyomo.environ import SolverFactory
+    
+    solver = SolverFactory('appsi_highs')
+    if not solver.available(exception_flag=False):
+        return SolverFactory('glpk')
+    
+    config = solver.update_config
+    config.check_for_new_or_removed_constraints = False
+    config.check_for_new_or_removed_vars = False
+    config.check_for_new_or_removed_params = False
+    config.check_for_new_objective = False
+    config.update_constraints = False
+    config.update_vars = False
+    config.update_named_expressions = False
+    return solver
@@ -4,95 +4,253 @@ Assignment Problem Example
 Assign workers to tasks to minimize total cost.
 Each worker gets exactly one task, each task gets exactly one worker.
 Add a 4th worker and constraint for exercise.
+
+The model is built once at import with a mutable cost table, so repeated
+solves (e.g. parameter sweeps) only update Param values and re-run the solver.
+When highspy is installed the persistent APPSI HiGHS interface keeps the model
+in memory between solves; otherwise the GLPK command-line solver is used.
+
+solve_assignment_batch() runs parameter sweeps across a process pool, each
+worker holding its own model and solver. solve_assignment_hungarian() solves
+the same problem without an LP solver via scipy's linear_sum_assignment
+(Hungarian / Jonker-Volgenant algorithm).
 """
 
-from pyomo.environ import *
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-def solve_assignment_problem():
-    """Solve a simple 3x3 assignment problem."""
-    
-    model = ConcreteModel(name="WorkerAssignment")
-    
-    # Data
-    workers = ['Alice', 'Bob', 'Carol','Jimmy']
-    tasks = ['Task1', 'Task2', 'Task3']
-    cost = {
-        ('Alice', 'Task1'): 15, ('Alice', 'Task2'): 35, ('Alice', 'Task3'): 1,
-        ('Bob', 'Task1'): 18, ('Bob', 'Task2'): 18, ('Bob', 'Task3'): 45,
-        ('Carol', 'Task1'): 17, ('Carol', 'Task2'): 23, ('Carol', 'Task3'): 38,
-        ('Jimmy', 'Task1'): 12, ('Jimmy', 'Task2'): 13, ('Jimmy', 'Task3'): 40
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from pyomo.common.tempfiles import TempfileManager
+from pyomo.environ import (
+    ConcreteModel, Set, Param, Var, Binary, Objective, Constraint, minimize,
+    quicksum, value, SolverStatus, TerminationCondition
+)
+
+# Add project root to path for imports
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.optimization import make_solver
 
-    }
+# Data
+WORKERS = ['Alice', 'Bob', 'Carol', 'Jimmy']
+TASKS = ['Task1', 'Task2', 'Task3']
+COST = {
+    ('Alice', 'Task1'): 15, ('Alice', 'Task2'): 35, ('Alice', 'Task3'): 1,
+    ('Bob', 'Task1'): 18, ('Bob', 'Task2'): 18, ('Bob', 'Task3'): 45,
+    ('Carol', 'Task1'): 17, ('Carol', 'Task2'): 23, ('Carol', 'Task3'): 38,
+    ('Jimmy', 'Task1'): 12, ('Jimmy', 'Task2'): 13, ('Jimmy', 'Task3'): 40
+}
+FORBIDDEN = [('Alice', 'Task3')]
 
+# Matrix positions of the forbidden pairs (rows = workers, columns = tasks)
+_FORBIDDEN_ROWS = np.array([WORKERS.index(w) for w, _ in FORBIDDEN], dtype=np.intp)
+_FORBIDDEN_COLS = np.array([TASKS.index(t) for _, t in FORBIDDEN], dtype=np.intp)
+
+# Scratch directory for file-based solvers (GLPK): tmpfs when available
+_SCRATCH_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def _build_model():
+    """Build the assignment model with a mutable cost Param."""
+    
+    model = ConcreteModel(name="WorkerAssignment")
     
     # Sets
-    model.Workers = Set(initialize=workers)
-    model.Tasks = Set(initialize=tasks)
+    model.Workers = Set(initialize=WORKERS)
+    model.Tasks = Set(initialize=TASKS)
     
-    # Parameters
-    model.cost = Param(model.Workers, model.Tasks, initialize=cost)
+    # Parameters (mutable so costs can change between solves)
+    model.cost = Param(model.Workers, model.Tasks, mutable=True, initialize=COST)
     
     # Variables: x[w,t] = 1 if worker w assigned to task t
     model.x = Var(model.Workers, model.Tasks, domain=Binary)
     
     # Objective: minimize total cost
     def obj_rule(model):
-        return sum(model.cost[w,t] * model.x[w,t] 
-                   for w in model.Workers for t in model.Tasks)
+        return quicksum(model.cost[w,t] * model.x[w,t]
+                        for w in model.Workers for t in model.Tasks)
     model.obj = Objective(rule=obj_rule, sense=minimize)
     
     # Constraint: each worker assigned to exactly one task
     def worker_constraint(model, w):
-        return sum(model.x[w,t] for t in model.Tasks) <= 1
+        return quicksum(model.x[w,t] for t in model.Tasks) <= 1
     model.worker_con = Constraint(model.Workers, rule=worker_constraint)
     
     # Constraint: each task assigned to exactly one worker
     def task_constraint(model, t):
-        return sum(model.x[w,t] for w in model.Workers) == 1
+        return quicksum(model.x[w,t] for w in model.Workers) == 1
     model.task_con = Constraint(model.Tasks, rule=task_constraint)
 
-        # Constraint: Alice cannot be assigned to Task3
-    def alice_constraint(model):
-        """Constraint for Alice cannont be assigned to Task3."""
-        return model.x['Alice', 'Task3'] == 0
-    model.alice_con = Constraint(rule=alice_constraint)
+    # Constraint: Alice cannot be assigned to Task3
+    def alice_constraint(model, w, t):
+        """Constraint for forbidden (worker, task) pairs."""
+        return model.x[w, t] == 0
+    model.alice_con = Constraint(FORBIDDEN, rule=alice_constraint)
+    
+    return model
+
+
+def _solve(model):
+    """Solve the model, keeping file-based solver scratch files on tmpfs."""
+    
+    previous = TempfileManager.tempdir
+    if _SCRATCH_DIR is not None:
+        TempfileManager.tempdir = _SCRATCH_DIR
+    try:
+        return _solver.solve(model, tee=False)
+    finally:
+        TempfileManager.tempdir = previous
+
+
+def _set_costs(model, cost):
+    """Write COST plus any overrides into the mutable cost Param."""
+    
+    cost_table = dict(COST)
+    if cost is not None:
+        cost_table.update(cost)
+    for k, v in cost_table.items():
+        model.cost[k] = v
+    return cost_table
+
+
+# Built once at import and re-solved with updated costs
+_model = _build_model()
+_solver = make_solver()
+
+
+def solve_assignment_problem(cost=None):
+    """
+    Solve a simple 4x3 assignment problem.
+    
+    Args:
+        cost: Optional {(worker, task): cost} overrides applied on top of COST
+    """
+    
+    model = _model
+    
+    # Update the mutable cost table instead of rebuilding the model
+    cost_table = _set_costs(model, cost)
     
     # Solve
-    print("=" * 60)
-    print("ASSIGNMENT PROBLEM")
-    print("=" * 60)
-    print("\nCost Matrix:")
-    print(f"{'':8}", end="")
-    for t in tasks:
-        print(f"{t:>8}", end="")
-    print()
-    for w in workers:
-        print(f"{w:8}", end="")
-        for t in tasks:
-            print(f"{cost[w,t]:8}", end="")
-        print()
-    
-    solver = SolverFactory('glpk')
-    result = solver.solve(model, tee=False)
+    lines = ["=" * 60, "ASSIGNMENT PROBLEM", "=" * 60, "\nCost Matrix:",
+             f"{'':8}" + "".join(f"{t:>8}" for t in TASKS)]
+    lines.extend(f"{w:8}" + "".join(f"{cost_table[w,t]:8}" for t in TASKS)
+                 for w in WORKERS)
+    print("\n".join(lines))
+    
+    result = _solve(model)
+    status = result.solver.status
+    termination = result.solver.termination_condition
     
     # Check solver status
-    if result.solver.status == SolverStatus.ok and \
-       result.solver.termination_condition == TerminationCondition.optimal:
-        print("\n✓ Optimal solution found!\n")
-        print(f"Minimum Total Cost: ${model.obj():.2f}\n")
-        print("Optimal Assignments:")
-        for w in model.Workers:
-            for t in model.Tasks:
-                if model.x[w,t].value > 0.5:
-                    print(f"  {w:8} → {t:8} (cost: ${model.cost[w,t]:3})")
+    if status == SolverStatus.ok and termination == TerminationCondition.optimal:
+        # Harvest variable values once, then work with plain Python data
+        solution = {(w,t): value(model.x[w,t]) for w in WORKERS for t in TASKS}
+        selected = [(w,t) for (w,t), v in solution.items() if v > 0.5]
+        
+        lines = ["\n✓ Optimal solution found!\n",
+                 f"Minimum Total Cost: ${value(model.obj):.2f}\n",
+                 "Optimal Assignments:"]
+        lines.extend(f"  {w:8} → {t:8} (cost: ${cost_table[w,t]:3})"
+                     for w, t in selected)
     else:
-        print("\n✗ Solver failed to find optimal solution")
-        print(f"Status: {result.solver.status}")
-        print(f"Termination: {result.solver.termination_condition}")
+        lines = ["\n✗ Solver failed to find optimal solution",
+                 f"Status: {status}",
+                 f"Termination: {termination}"]
     
-    print("\n" + "=" * 60 + "\n")
+    lines.append("\n" + "=" * 60 + "\n")
+    print("\n".join(lines))
     
     return model
 
+
+def _init_worker():
+    """Give each pool process its own model and solver instance."""
+    global _model, _solver
+    _model = _build_model()
+    _solver = make_solver()
+
+
+def _worker_solve(cost):
+    """Solve one cost table quietly; returns (total_cost, assignments) or None."""
+    
+    _set_costs(_model, cost)
+    result = _solve(_model)
+    if result.solver.status != SolverStatus.ok or \
+       result.solver.termination_condition != TerminationCondition.optimal:
+        return None
+    
+    selected = [(w,t) for w in WORKERS for t in TASKS if value(_model.x[w,t]) > 0.5]
+    return value(_model.obj), selected
+
+
+def solve_assignment_batch(costs, max_workers=None):
+    """
+    Solve many cost scenarios in parallel across a process pool.
+    
+    Args:
+        costs: Iterable of {(worker, task): cost} overrides (see solve_assignment_problem)
+        max_workers: Number of worker processes (default: number of CPUs)
+    
+    Returns:
+        list: (total_cost, [(worker, task), ...]) per scenario, or None if not optimal
+    """
+    
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker) as pool:
+        return list(pool.map(_worker_solve, costs))
+
+
+def build_cost_matrix(cost_table, out=None):
+    """
+    Convert a {(worker, task): cost} table into a dense workers x tasks matrix.
+    
+    Forbidden pairs are set to inf. Pass a preallocated float64 `out` array to
+    reuse it across repeated solves.
+    """
+    
+    shape = (len(WORKERS), len(TASKS))
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    # Assign through out[...] so non-contiguous buffers (e.g. a transposed
+    # view) are written in place; reshape(-1) would copy them silently
+    out[...] = np.fromiter(
+        (cost_table[w, t] for w in WORKERS for t in TASKS),
+        dtype=np.float64, count=shape[0] * shape[1]
+    ).reshape(shape)
+    out[_FORBIDDEN_ROWS, _FORBIDDEN_COLS] = np.inf
+    return out
+
+
+def solve_assignment_hungarian(cost=None):
+    """
+    Solve the assignment problem with the Hungarian algorithm (no LP solver).
+    
+    Args:
+        cost: Optional {(worker, task): cost} overrides applied on top of COST
+    
+    Returns:
+        tuple: ([(worker, task), ...], total_cost)
+    """
+    
+    cost_table = dict(COST)
+    if cost is not None:
+        cost_table.update(cost)
+    
+    C = build_cost_matrix(cost_table)
+    
+    # Rectangular (4 workers x 3 tasks): every task assigned, one worker idle
+    row_ind, col_ind = linear_sum_assignment(C)
+    assignments = [(WORKERS[i], TASKS[j]) for i, j in zip(row_ind, col_ind)]
+    return assignments, float(C[row_ind, col_ind].sum())
+
+
 if __name__ == "__main__":
     model = solve_assignment_problem()
+    assignments, total_cost = solve_assignment_hungarian()
+    print(f"Hungarian algorithm check: ${total_cost:.2f} {assignments}")
@@ -4,9 +4,22 @@ Railway Dataset Preparation Guide
 
 This guide covers obtaining and preparing datasets for the railway optimization project.
 """
+import json
+import os
+import pickle
+import string
 import sys
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice, product
+from operator import itemgetter
 from pathlib import Path
 
+import networkx as nx
+import numpy as np
+import pandas as pd
+
 # Add project root to path for imports
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
@@ -22,78 +35,181 @@ from src.generic.preamble import (
 # OPTION 1: SYNTHETIC REALISTIC DATA (RECOMMENDED FOR LEARNING)
 # =====================================================================
 
+# Single seed for all synthetic data (network, attributes and demands)
+DEFAULT_SEED = 42
+
+# Commodity-specific cost multipliers, shared by every edge (treat as read-only;
+# copy with dict(...) before modifying a single edge)
+_COST_MULTIPLIERS = {
+    'Coal': 1.0,
+    'Grain': 1.2,
+    'Containers': 1.5,
+    'Chemicals': 2.0
+}
+
+
+@lru_cache(maxsize=None)
+def _yard_names(num_yards):
+    """Yard names Yard_AA, Yard_AB, ... for the first num_yards yards."""
+    return tuple(f"Yard_{a}{b}" for a, b in
+                 islice(product(string.ascii_uppercase, repeat=2), num_yards))
+
+
+def _int_array(values, dtype):
+    """values as dtype, or as int64 if any value lies outside dtype's range."""
+    arr = np.asarray(values, dtype=np.int64)
+    info = np.iinfo(dtype)
+    if arr.size and (arr.min() < info.min or arr.max() > info.max):
+        return arr
+    return arr.astype(dtype)
+
+
+@dataclass
+class RailNetwork:
+    """
+    Edge arrays (structure-of-arrays) for a railway network.
+    
+    Edge e runs from yard u[e] to yard v[e]; the remaining arrays hold the
+    per-edge attributes in the same order. cost_multipliers is indexed by
+    commodity (in `commodities` order) and shared by all edges. Attributes use
+    the smallest dtype that fits the generated value ranges; from_graph widens
+    an attribute to int64 when a graph's values fall outside that dtype.
+    """
+    u: np.ndarray                 # int32
+    v: np.ndarray                 # int32
+    capacity: np.ndarray          # uint8 (50-150)
+    distance: np.ndarray          # int16 (100-500 miles)
+    base_cost: np.ndarray         # uint8 (5-25)
+    cost_multipliers: np.ndarray  # float32 (1.0-2.0)
+    commodities: tuple
+    
+    @property
+    def num_edges(self):
+        return len(self.u)
+    
+    def edge_costs(self):
+        """Per-edge, per-commodity unit costs, shape (num_edges, num_commodities)."""
+        return self.base_cost.astype(np.float32)[:, None] * self.cost_multipliers
+    
+    def edge_attributes(self):
+        """{(u, v): {attribute: value}} dicts for building a NetworkX graph."""
+        # str() gives the shortest float32 repr, so 1.2 stays 1.2 (not 1.2000000476...)
+        multipliers = {k: float(str(m))
+                       for k, m in zip(self.commodities, self.cost_multipliers)}
+        return {
+            (u, v): {'capacity': cap, 'distance': dist, 'base_cost': base,
+                     'cost_multipliers': multipliers}
+            for u, v, cap, dist, base in zip(
+                self.u.tolist(), self.v.tolist(), self.capacity.tolist(),
+                self.distance.tolist(), self.base_cost.tolist())
+        }
+    
+    @classmethod
+    def from_graph(cls, G):
+        """Extract edge arrays from a graph built by generate_synthetic_railway_network."""
+        edges = list(G.edges(data=True))
+        multipliers = edges[0][2]['cost_multipliers'] if edges else _COST_MULTIPLIERS
+        return cls(
+            u=np.array([u for u, _, _ in edges], dtype=np.int32),
+            v=np.array([v for _, v, _ in edges], dtype=np.int32),
+            capacity=_int_array([d['capacity'] for _, _, d in edges], np.uint8),
+            distance=_int_array([d['distance'] for _, _, d in edges], np.int16),
+            base_cost=_int_array([d['base_cost'] for _, _, d in edges], np.uint8),
+            cost_multipliers=np.array(list(multipliers.values()), dtype=np.float32),
+            commodities=tuple(multipliers),
+        )
+
+
+def _sample_rail_network(rng, num_yards, num_connections):
+    """Sample distinct directed edges (no self-loops) and their attributes."""
+    
+    # Encode each of the n*(n-1) possible edges as an integer and sample ids;
+    # id -> (u, r) with r indexing the other n-1 yards, skipping u itself
+    edge_ids = np.sort(rng.choice(num_yards * (num_yards - 1),
+                                  size=num_connections, replace=False))
+    u, r = np.divmod(edge_ids, num_yards - 1)
+    v = r + (r >= u)
+    
+    return RailNetwork(
+        u=u.astype(np.int32),
+        v=v.astype(np.int32),
+        capacity=rng.integers(50, 151, num_connections, dtype=np.uint8),
+        distance=rng.integers(100, 501, num_connections, dtype=np.int16),  # miles
+        base_cost=rng.integers(5, 26, num_connections, dtype=np.uint8),
+        cost_multipliers=np.array(list(_COST_MULTIPLIERS.values()), dtype=np.float32),
+        commodities=tuple(_COST_MULTIPLIERS),
+    )
 
 
-def generate_synthetic_railway_network():
+def generate_synthetic_railway_network(seed=DEFAULT_SEED):
     """
     Generate a realistic synthetic railway network for testing.
     This is the FASTEST way to get started and allows full control.
-    """
-    import networkx as nx
-    import random
-    import json
     
+    Args:
+        seed: Seed for the single NumPy generator behind every random draw,
+              so the whole dataset is reproducible
+    """
     # Network parameters
     num_yards = 20  # Major rail yards
     num_connections = 50  # Rail connections
     num_commodities = 4  # Freight types
     
-    # Create directed graph
-    G = nx.gnm_random_graph(n=num_yards, m=num_connections, directed=True, seed=42)
-    
     # Assign realistic attributes
-    yard_names = [f"Yard_{chr(65+i//26)}{chr(65+i%26)}" for i in range(num_yards)]
-    commodity_types = ['Coal', 'Grain', 'Containers', 'Chemicals']
+    yard_names = _yard_names(num_yards)
+    commodity_types = list(_COST_MULTIPLIERS)
     
-    # Node attributes (yards)
-    for node_id, name in enumerate(yard_names):
-        G.nodes[node_id]['name'] = name
-        G.nodes[node_id]['lat'] = 35 + random.uniform(-10, 10)
-        G.nodes[node_id]['lon'] = -100 + random.uniform(-20, 20)
-        G.nodes[node_id]['capacity'] = random.randint(50, 200)
-    
-    # Edge attributes (rail connections)
-    for (u, v) in G.edges():
-        G[u][v]['capacity'] = random.randint(50, 150)
-        G[u][v]['distance'] = random.randint(100, 500)  # miles
-        G[u][v]['base_cost'] = random.randint(5, 25)
-        # Commodity-specific multipliers
-        G[u][v]['cost_multipliers'] = {
-            'Coal': 1.0,
-            'Grain': 1.2,
-            'Containers': 1.5,
-            'Chemicals': 2.0
-        }
+    # Draw all attributes in batches (one RNG call per attribute)
+    rng = np.random.default_rng(seed)
+    
+    # Rail connections as edge arrays, then materialized as a directed graph
+    network = _sample_rail_network(rng, num_yards, num_connections)
     
-    # Generate freight demands
-    demands = []
-    for _ in range(30):  # 30 shipments
-        origin = random.randint(0, num_yards-1)
-        destination = random.randint(0, num_yards-1)
-        if origin != destination:
-            demands.append({
-                'commodity': random.choice(commodity_types),
-                'origin': origin,
-                'destination': destination,
-                'amount': random.randint(20, 100),
-                'priority': random.choice(['high', 'medium', 'low']),
-                'deadline': random.randint(12, 72)  # hours
-            })
+    # Node attributes (yards)
+    lats = (35 + rng.uniform(-10, 10, num_yards)).tolist()
+    lons = (-100 + rng.uniform(-20, 20, num_yards)).tolist()
+    node_caps = rng.integers(50, 201, num_yards).tolist()
+    
+    G = nx.DiGraph()
+    G.add_nodes_from(
+        (node_id, {'name': name, 'lat': lats[node_id], 'lon': lons[node_id],
+                   'capacity': node_caps[node_id]})
+        for node_id, name in enumerate(yard_names)
+    )
+    G.add_edges_from((u, v, attrs) for (u, v), attrs in network.edge_attributes().items())
+    
+    # Generate freight demands (resample destinations that equal the origin)
+    num_demands = 30  # 30 shipments
+    origins = rng.integers(0, num_yards, num_demands)
+    destinations = rng.integers(0, num_yards, num_demands)
+    same = origins == destinations
+    while same.any():
+        destinations[same] = rng.integers(0, num_yards, same.sum())
+        same = origins == destinations
+    
+    columns = {
+        'commodity': rng.choice(commodity_types, num_demands).tolist(),
+        'origin': origins.tolist(),
+        'destination': destinations.tolist(),
+        'amount': rng.integers(20, 101, num_demands).tolist(),
+        'priority': rng.choice(['high', 'medium', 'low'], num_demands).tolist(),
+        'deadline': rng.integers(12, 73, num_demands).tolist()  # hours
+    }
+    demands = [dict(zip(columns, row)) for row in zip(*columns.values())]
     
     # Save to files using preamble paths
-    import pickle
     network_file = Path(raw_data) / 'network_graph.pkl'
     demands_file = Path(raw_data) / 'demands.json'
 
     with open(network_file, 'wb') as f:
-        pickle.dump(G, f)
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     with open(demands_file, 'w') as f:
         json.dump(demands, f, indent=2)
 
-    print(f"✓ Generated network: {num_yards} yards, {G.number_of_edges()} connections")
-    print(f"✓ Generated {len(demands)} freight demands")
-    print(f"✓ Saved to {raw_data}/")
+    print(f"✓ Generated network: {num_yards} yards, {G.number_of_edges()} connections\n"
+          f"✓ Generated {len(demands)} freight demands\n"
+          f"✓ Saved to {raw_data}/")
     
     return G, demands
 
@@ -114,7 +230,6 @@ def fetch_osm_railway_data(bbox=None):
     """
     try:
         import osmnx as ox
-        import networkx as nx
     except ImportError:
         print("⚠️  Please install osmnx: pip install osmnx --break-system-packages")
         return None
@@ -148,14 +263,58 @@ def fetch_osm_railway_data(bbox=None):
         G[u][v][k]['base_cost'] = 10
     
     # Save using preamble paths
-    import pickle
     osm_file = Path(raw_data) / 'osm_railway_network.pkl'
 
     with open(osm_file, 'wb') as f:
-        pickle.dump(G, f)
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     print(f"✓ Saved to {osm_file}")
     
+    # Columnar edge/node lists load much faster than the pickled object graph
+    save_osm_edge_list(G)
+    
+    return G
+
+
+def save_osm_edge_list(G):
+    """
+    Save the routing-relevant columns of an OSM graph as parquet edge/node lists.
+    
+    Requires: pip install pyarrow
+    """
+    edges_df = pd.DataFrame(
+        [(u, v, k, d['capacity'], d['base_cost'])
+         for u, v, k, d in G.edges(keys=True, data=True)],
+        columns=['u', 'v', 'key', 'capacity', 'base_cost']
+    )
+    nodes_df = pd.DataFrame(
+        [(n, d.get('x'), d.get('y')) for n, d in G.nodes(data=True)],
+        columns=['node', 'x', 'y']
+    )
+    
+    try:
+        edges_df.to_parquet(Path(raw_data) / 'osm_edges.parquet', index=False)
+        nodes_df.to_parquet(Path(raw_data) / 'osm_nodes.parquet', index=False)
+    except ImportError:
+        print("⚠️  Please install pyarrow to save parquet edge lists: pip install pyarrow")
+        return
+    
+    print(f"✓ Saved edge/node lists to {raw_data}/osm_edges.parquet, osm_nodes.parquet")
+
+
+def load_osm_edge_list():
+    """Rebuild the OSM railway graph from the parquet edge/node lists."""
+    edges_df = pd.read_parquet(Path(raw_data) / 'osm_edges.parquet')
+    nodes_df = pd.read_parquet(Path(raw_data) / 'osm_nodes.parquet')
+    
+    G = nx.from_pandas_edgelist(
+        edges_df, source='u', target='v', edge_key='key',
+        edge_attr=['capacity', 'base_cost'], create_using=nx.MultiDiGraph
+    )
+    G.add_nodes_from(
+        (n, {'x': x, 'y': y})
+        for n, x, y in zip(nodes_df['node'], nodes_df['x'], nodes_df['y'])
+    )
     return G
 
 
@@ -180,8 +339,6 @@ def fetch_bts_freight_data():
     - Commodity types
     - Tonnage estimates
     """
-    import pandas as pd
-
     bts_file = Path(raw_data) / 'bts_freight.csv'
 
     try:
@@ -199,41 +356,44 @@ def fetch_bts_freight_data():
 # RECOMMENDED APPROACH FOR DAY 1
 # =====================================================================
 
-def prepare_day1_dataset():
+def prepare_day1_dataset(seed=DEFAULT_SEED):
     """
     Recommended: Start with synthetic data for quick iteration.
     This gives you full control and fast debugging.
-    """
-    import networkx as nx
-    
-    print("=" * 60)
-    print("RAILWAY DATASET PREPARATION")
-    print("=" * 60)
-    
-    print("\n🎯 Generating synthetic railway network...")
-    G, demands = generate_synthetic_railway_network()
-    
-    # Display summary statistics
-    print("\n📊 Network Statistics:")
-    print(f"  Nodes (yards): {G.number_of_nodes()}")
-    print(f"  Edges (tracks): {G.number_of_edges()}")
-    print(f"  Avg degree: {sum(dict(G.degree()).values()) / G.number_of_nodes():.1f}")
-    print(f"  Network density: {nx.density(G):.3f}")
-    
-    print("\n🚂 Demand Statistics:")
-    commodity_counts = {}
-    for d in demands:
-        c = d['commodity']
-        commodity_counts[c] = commodity_counts.get(c, 0) + 1
-    
-    for commodity, count in commodity_counts.items():
-        print(f"  {commodity}: {count} shipments")
-    
-    total_volume = sum(d['amount'] for d in demands)
-    print(f"\n  Total freight volume: {total_volume} units")
     
-    print("\n✅ Dataset ready for Day 2 optimization model!")
-    print("\n" + "=" * 60)
+    Args:
+        seed: Seed passed to generate_synthetic_railway_network
+    """
+    print("\n".join(["=" * 60, "RAILWAY DATASET PREPARATION", "=" * 60,
+                     "\n🎯 Generating synthetic railway network..."]))
+    G, demands = generate_synthetic_railway_network(seed=seed)
+    
+    # Display summary statistics (closed forms; degree counts in + out edges)
+    num_nodes, num_edges = G.number_of_nodes(), G.number_of_edges()
+    avg_degree = 2 * num_edges / num_nodes if num_nodes else 0.0
+    max_edges = num_nodes * (num_nodes - 1)
+    if num_nodes <= 1:
+        density = 0.0  # as nx.density
+    else:
+        density = num_edges / max_edges if G.is_directed() else 2 * num_edges / max_edges
+    
+    lines = [
+        "\n📊 Network Statistics:",
+        f"  Nodes (yards): {num_nodes}",
+        f"  Edges (tracks): {num_edges}",
+        f"  Avg degree: {avg_degree:.1f}",
+        f"  Network density: {density:.3f}",
+        "\n🚂 Demand Statistics:",
+    ]
+    commodity_counts = Counter(map(itemgetter('commodity'), demands))
+    lines.extend(f"  {commodity}: {count} shipments"
+                 for commodity, count in commodity_counts.items())
+    
+    total_volume = sum(map(itemgetter('amount'), demands))
+    lines += [f"\n  Total freight volume: {total_volume} units",
+              "\n✅ Dataset ready for Day 2 optimization model!",
+              "\n" + "=" * 60]
+    print("\n".join(lines))
     
     return G, demands
 
@@ -242,31 +402,47 @@ def prepare_day1_dataset():
 # DATASET VISUALIZATION (OPTIONAL)
 # =====================================================================
 
-def visualize_network(G):
-    """Create a simple visualization of the network."""
+def visualize_network(G, with_labels=False):
+    """
+    Create a simple visualization of the network.
+    
+    Edges are drawn as a single LineCollection (plus one quiver of mid-edge
+    arrowheads for directed graphs) and nodes as a single scatter, so the
+    number of matplotlib artists does not grow with network size.
+    
+    Args:
+        G: Railway network graph
+        with_labels: Annotate each yard with its node id (one text artist per node)
+    """
     import matplotlib.pyplot as plt
-    import networkx as nx
-    
-    plt.figure(figsize=(12, 8))
-    
-    # Get positions from lat/lon if available
-    pos = {}
-    for node in G.nodes():
-        if 'lat' in G.nodes[node] and 'lon' in G.nodes[node]:
-            pos[node] = (G.nodes[node]['lon'], G.nodes[node]['lat'])
-        else:
-            pos = nx.spring_layout(G)  # Fallback
-            break
-    
-    # Draw network
-    nx.draw(G, pos, 
-            node_size=300,
-            node_color='lightblue',
-            edge_color='gray',
-            arrows=True,
-            arrowsize=10,
-            with_labels=True,
-            font_size=8)
+    from matplotlib.collections import LineCollection
+    
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
+    # Get positions from lat/lon if every node has them
+    node_data = G.nodes(data=True)
+    if all('lat' in d and 'lon' in d for _, d in node_data):
+        pos = {n: (d['lon'], d['lat']) for n, d in node_data}
+    else:
+        pos = nx.spring_layout(G)  # Fallback
+    
+    # Draw network (reshape keeps (0, 2) arrays for graphs without nodes/edges)
+    xy = np.array([pos[n] for n in G.nodes()], dtype=np.float64).reshape(-1, 2)
+    segments = np.array([(pos[u], pos[v]) for u, v in G.edges()],
+                        dtype=np.float64).reshape(-1, 2, 2)
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=1.0, zorder=1))
+    if G.is_directed() and len(segments):
+        # Direction: arrowhead at each edge midpoint, pointing from u to v
+        tails, heads = segments[:, 0], segments[:, 1]
+        half = (heads - tails) / 2
+        ax.quiver(tails[:, 0], tails[:, 1], half[:, 0], half[:, 1], color='gray',
+                  angles='xy', scale_units='xy', scale=1, width=0.002,
+                  headwidth=6, headlength=8, zorder=1)
+    ax.scatter(xy[:, 0], xy[:, 1], s=300, c='lightblue', zorder=2)
+    if with_labels:
+        for n, (x, y) in pos.items():
+            ax.text(x, y, str(n), fontsize=8, ha='center', va='center', zorder=3)
+    ax.set_axis_off()
     
     plt.title("Railway Network Topology")
     plt.tight_layout()
@@ -284,7 +460,6 @@ def visualize_network(G):
 
 if __name__ == "__main__":
     # Ensure directories exist using preamble paths
-    import os
     os.makedirs(raw_data, exist_ok=True)
     os.makedirs(processed_data, exist_ok=True)
     os.makedirs(figures_path, exist_ok=True)
@@ -16,154 +16,613 @@ Commodities:
 Each arc has capacity and commodity-specific costs.
 
 Exercise: add a 3rd commodity, change network topology, add a capacity constraint
+
+Solution methods:
+- 'pyomo' (default): arc-based multi-commodity LP solved with Pyomo, in process
+  with HiGHS when highspy is installed, otherwise with the GLPK executable
+- 'networkx': one nx.min_cost_flow (network simplex) per commodity. Dropping the
+  shared arc capacities gives a relaxation, so when the combined flows still fit
+  every arc the result is optimal; otherwise it falls back to the Pyomo LP.
+- 'linprog': the same LP as dense NumPy arrays solved by scipy.optimize.linprog
+  (HiGHS), skipping Pyomo model construction entirely
+- 'decomposition': Dantzig-Wolfe column generation. The shared capacities stay
+  in a small master LP whose duals price the arcs; each commodity is then an
+  independent min-cost flow, so capacity coupling is handled exactly.
+- 'paths': the LP over whole paths (A-B-E, A-B-D-E, A-C-D-E for the default
+  data) instead of arcs. Paths are enumerated once per origin-destination pair,
+  leaving 9 variables and no flow conservation rows.
 """
 
-from pyomo.environ import *
+import sys
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+from scipy.optimize import linprog
+from pyomo.common.timing import TicTocTimer
+from pyomo.core.expr.numeric_expr import LinearExpression
+from pyomo.environ import (
+    ConcreteModel, Param, Var, NonNegativeReals, Objective, Constraint,
+    minimize, SolverStatus, TerminationCondition
+)
+
+# Add project root to path for imports
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.optimization import make_solver
+
+# Network topology
+NODES = ['A', 'B', 'C', 'D','E']
+ARCS = [('A','B'), ('A','C'), ('B','D'), ('B','E'), ('C','D'), ('D','E')]
+COMMODITIES = ['Coal', 'Grain','Sugar']
+
+# Arc data as parallel arrays, indexed by arc position in ARCS
+#                      A→B A→C  B→D  B→E C→D  D→E
+CAPACITIES = np.array([100, 60, 100, 150, 60, 150])
+
+# Commodity-specific costs: COSTS[k, a] for commodity k (COMMODITIES order)
+COSTS = np.array([
+    [5, 7, 4, 2, 6, 4],  # Coal
+    [6, 5, 7, 2, 4, 4],  # Grain
+    [7, 6, 5, 2, 5, 4],  # Sugar
+])
+
+# Demand: (origin, destination, amount)
+DEMAND = {
+    'Coal': ('A', 'E', 50),
+    'Grain': ('A', 'E', 40),
+    'Sugar': ('A', 'E', 60)
+}
+
+# Commodity-specific arc limits: limit sugar flow from B to E to 30 units
+ARC_LIMITS = {('Sugar', 'B', 'E'): 30}
+
+# Position of each arc in ARCS (and in the columns of COSTS)
+_ARC_POS = {arc: a_idx for a_idx, arc in enumerate(ARCS)}
+
+# Pyomo index of each COSTS entry, in COSTS.ravel() (commodity-major) order
+_COST_KEYS = [(k, i, j) for k in COMMODITIES for (i,j) in ARCS]
+
+# Pyomo index of each (commodity, node) flow balance row
+_NODE_KEYS = [(k, n) for k in COMMODITIES for n in NODES]
+
+# Arc endpoints as node positions, and the node-arc incidence matrix built
+# from them: +1 where the arc leaves the node, -1 where it enters
+_TAIL = np.array([NODES.index(i) for (i,j) in ARCS], dtype=np.intp)
+_HEAD = np.array([NODES.index(j) for (i,j) in ARCS], dtype=np.intp)
+_INCIDENCE = np.zeros((len(NODES), len(ARCS)))
+_INCIDENCE[_TAIL, np.arange(len(ARCS))] = 1
+_INCIDENCE[_HEAD, np.arange(len(ARCS))] = -1
+
+# Dense LP structure for the 'linprog' method; only right-hand sides and
+# costs change between scenarios
+_LP_A_EQ = np.kron(np.eye(len(COMMODITIES)), _INCIDENCE)
+_LP_A_UB = np.tile(np.eye(len(ARCS)), len(COMMODITIES))
+_LP_BOUNDS = [(0, ARC_LIMITS.get(key)) for key in _COST_KEYS]
+
+# Utilization bars for 0-100% in 5% steps, indexed by filled length
+_BARS = tuple("█" * i + "░" * (20 - i) for i in range(21))
+
+
+def _adjacency(nodes, arcs):
+    """Predecessors and successors of each node, built in one pass over arcs."""
+    preds = {n: [] for n in nodes}
+    succs = {n: [] for n in nodes}
+    for i, j in arcs:
+        succs[i].append(j)
+        preds[j].append(i)
+    return ({n: tuple(p) for n, p in preds.items()},
+            {n: tuple(q) for n, q in succs.items()})
+
+
+# Fixed topology: used by every flow conservation rule
+_IN_ARCS, _OUT_ARCS = _adjacency(NODES, ARCS)
+
+
+def _net_supply(demand):
+    """Net supply per (commodity, node): +amount at origin, -amount at destination."""
+    supply = dict.fromkeys(_NODE_KEYS, 0)
+    for k, (origin, destination, amount) in demand.items():
+        supply[k, origin] += amount
+        supply[k, destination] -= amount
+    return supply
+
+
+# Pyomo model and solver, created on first use and re-solved with updated
+# Params; the 'linprog' and 'networkx' methods never touch either
+_MODEL = None
+_solver = None
+
+# Seconds spent in each phase of the latest Pyomo solve ('build' is recorded
+# once, when the model is constructed)
+PHASE_TIMES = {}
+
+# Accepted values of solve_railway_routing(method=...)
+_METHODS = ('pyomo', 'linprog', 'networkx', 'decomposition', 'paths', 'auto')
+
+# method='auto' uses the dense linprog formulation up to this many flow
+# variables, and the sparse persistent Pyomo model beyond it
+AUTO_DENSE_MAX_VARS = 1000
 
-def solve_railway_routing():
-    """Solve simplified multi-commodity railway routing problem."""
+
+def _build_model():
+    """Build the multi-commodity LP once, with mutable data Params."""
     
     model = ConcreteModel(name="SimplifiedRailway")
     
-    # Network topology
-    nodes = ['A', 'B', 'C', 'D','E']
-    arcs = [('A','B'), ('A','C'), ('B','D'), ('B','E'), ('C','D'), ('D','E')]
-    commodities = ['Coal', 'Grain','Sugar']
-    
-    # Arc data: (capacity, cost_coal, cost_grain, cost_sugar)
-    arc_data = {
-        ('A','B'): (100, 5, 6, 7),
-        ('A','C'): (60, 7, 5, 6),
-        ('B','D'): (100, 4, 7, 5),
-        ('B','E'): (150, 2, 2, 2),
-        ('C','D'): (60, 6, 4, 5),
-        ('D','E'): (150, 4, 4, 4)
-    }
-    
-    # Demand: (origin, destination, amount)
-    demand = {
-        'Coal': ('A', 'E', 50),
-        'Grain': ('A', 'E', 40),
-        'Sugar': ('A', 'E', 60)
-    }
-    
-    # Sets
-    model.Nodes = Set(initialize=nodes)
-    model.Arcs = Set(initialize=arcs)
-    model.Commodities = Set(initialize=commodities)
-    
-    # Parameters
-    model.capacity = Param(model.Arcs, initialize={a: arc_data[a][0] for a in arcs})
+    # Components are indexed by the flat key lists directly rather than by
+    # explicit Set components and their cross products
+    
+    # Parameters (mutable so scenarios only update values)
+    model.capacity = Param(ARCS, mutable=True,
+                           initialize=dict(zip(ARCS, CAPACITIES.tolist())))
     
     # Commodity-specific costs
-    cost_dict = {}
-    for k_idx, k in enumerate(commodities):
-        for a in arcs:
-            cost_dict[k, a] = arc_data[a][k_idx + 1]
-    model.cost = Param(model.Commodities, model.Arcs, initialize=cost_dict)
+    model.cost = Param(_COST_KEYS, mutable=True,
+                       initialize=dict(zip(_COST_KEYS, COSTS.ravel().tolist())))
+    
+    # Net supply of each commodity at each node (from the demand table)
+    model.supply = Param(_NODE_KEYS, mutable=True,
+                         initialize=_net_supply(DEMAND))
     
     # Variables: flow[k, i, j] = amount of commodity k on arc (i,j)
-    model.flow = Var(model.Commodities, model.Arcs, domain=NonNegativeReals)
+    model.flow = Var(_COST_KEYS, domain=NonNegativeReals)
     
     # Objective: minimize total transportation cost
+    # (LinearExpression built directly from coefficient/variable lists)
     def obj_rule(model):
-        return sum(model.cost[k,i,j] * model.flow[k,i,j]
-                   for k in model.Commodities for (i,j) in model.Arcs)
+        return LinearExpression(constant=0,
+                                linear_coefs=[model.cost[key] for key in _COST_KEYS],
+                                linear_vars=[model.flow[key] for key in _COST_KEYS])
     model.obj = Objective(rule=obj_rule, sense=minimize)
     
     # Flow conservation constraints
     def flow_conservation(model, k, node):
-        origin, destination, amount = demand[k]
+        # Outflow (+1): flows leaving this node; inflow (-1): flows coming in
+        outflow = [model.flow[k,node,j] for j in _OUT_ARCS[node]]
+        inflow = [model.flow[k,i,node] for i in _IN_ARCS[node]]
+        net_outflow = LinearExpression(
+            constant=0,
+            linear_coefs=[1] * len(outflow) + [-1] * len(inflow),
+            linear_vars=outflow + inflow)
         
-        # Inflow: sum of flows coming into this node
-        inflow = sum(model.flow[k,i,node] for (i,j) in model.Arcs if j == node)
-        # Outflow: sum of flows leaving this node
-        outflow = sum(model.flow[k,node,j] for (i,j) in model.Arcs if i == node)
-        
-        if node == origin:
-            return outflow - inflow == amount  # Source node
-        elif node == destination:
-            return inflow - outflow == amount  # Sink node
-        else:
-            return inflow == outflow  # Transit node (flow in = flow out)
+        # Source: +amount, sink: -amount, transit: 0 (flow in = flow out)
+        return net_outflow == model.supply[k,node]
             
-    model.flow_con = Constraint(model.Commodities, model.Nodes, 
-                                rule=flow_conservation)
+    model.flow_con = Constraint(_NODE_KEYS, rule=flow_conservation)
     
-    # Capacity constraints: total flow on each arc cannot exceed capacity
+    # Capacity constraints: total flow on each arc cannot exceed capacity.
+    # The unit coefficients are shared by every arc, and the (lower, body,
+    # upper) tuple form skips building an inequality expression per arc
+    unit_coefs = [1] * len(COMMODITIES)
     def capacity_constraint(model, i, j):
-        return sum(model.flow[k,i,j] for k in model.Commodities) <= model.capacity[i,j]
-    model.cap_con = Constraint(model.Arcs, rule=capacity_constraint)
+        total_flow = LinearExpression(
+            constant=0,
+            linear_coefs=unit_coefs,
+            linear_vars=[model.flow[k,i,j] for k in COMMODITIES])
+        return (None, total_flow, model.capacity[i,j])
+    model.cap_con = Constraint(ARCS, rule=capacity_constraint)
 
-    # Commodity-specific arc constraint: limit sugar flow from B to E to 30 units
-    model.sugar_B_E_limit = Constraint(
-        expr=model.flow['Sugar', 'B', 'E'] <= 30
-    )
+    # Commodity-specific arc constraints (e.g. sugar on B → E)
+    def arc_limit_constraint(model, k, i, j):
+        return model.flow[k,i,j] <= ARC_LIMITS[k,i,j]
+    model.arc_limit_con = Constraint(list(ARC_LIMITS), rule=arc_limit_constraint)
     
-    # Display problem setup
-    print("=" * 70)
-    print("SIMPLIFIED RAILWAY ROUTING - MULTI-COMMODITY FLOW")
-    print("=" * 70)
+    return model
+
+
+def _solve_pyomo(capacities, costs, demand):
+    """Solve the multi-commodity LP with Pyomo; returns (flows, status, termination)."""
+    
+    global _MODEL, _solver
+    timer = TicTocTimer()
+    timer.tic(None)
+    if _MODEL is None:
+        _MODEL = _build_model()
+        _solver = make_solver()
+        PHASE_TIMES['build'] = timer.toc(None)
+    model = _MODEL
+    
+    # Update the mutable Params instead of rebuilding the model
+    for a, v in zip(ARCS, capacities.tolist()):
+        model.capacity[a] = v
+    for key, v in zip(_COST_KEYS, costs.ravel().tolist()):
+        model.cost[key] = v
+    for key, v in _net_supply(demand).items():
+        model.supply[key] = v
+    PHASE_TIMES['update'] = timer.toc(None)
+    
+    # Load values only once optimality is confirmed, so infeasible scenarios
+    # are reported rather than raising
+    result = _solver.solve(model, tee=False, load_solutions=False)
+    PHASE_TIMES['solve'] = timer.toc(None)
+    
+    # Check solver status
+    if result.solver.status == SolverStatus.ok and \
+       result.solver.termination_condition == TerminationCondition.optimal:
+        model.solutions.load_from(result)
+        flows = {key: model.flow[key].value for key in _COST_KEYS}
+    else:
+        flows = None
+    return flows, result.solver.status, result.solver.termination_condition
+
+
+def _solve_linprog(capacities, costs, demand):
+    """
+    Solve the multi-commodity LP as dense arrays with scipy's HiGHS linprog.
+    
+    Variables are ordered commodity-major: x[k * len(ARCS) + a] = flow of
+    commodity k on arc a. Returns (flows, status, termination).
+    """
+    
+    # Flow conservation per (commodity, node): outflow - inflow = net supply
+    b_eq = np.fromiter(_net_supply(demand).values(), dtype=np.float64,
+                       count=len(_NODE_KEYS))
+    
+    # Shared arc capacity: sum over commodities of flow on each arc
+    res = linprog(costs.ravel(), A_ub=_LP_A_UB, b_ub=capacities,
+                  A_eq=_LP_A_EQ, b_eq=b_eq, bounds=_LP_BOUNDS, method='highs')
+    if res.status != 0:
+        return None, 'error', res.message
+    
+    flows = dict(zip(_COST_KEYS, res.x.tolist()))
+    return flows, 'ok', 'optimal'
+
+
+def _solve_networkx(capacities, costs, demand):
+    """
+    Solve each commodity as an independent min-cost flow with NetworkX.
     
-    print("\n📊 Network Topology:")
-    print("    A → B → E")
-    print("    ↓   ↓")
-    print("    C → D -> E")
+    Returns (flows, status, termination); flows is None when a commodity has no
+    feasible routing, capacities or demands are not whole numbers (network
+    simplex needs integer data), or the combined flows exceed a shared arc
+    capacity.
+    """
     
-    print("\n🚂 Freight Demand:")
-    for k in commodities:
+    amounts = [demand[k][2] for k in COMMODITIES]
+    if np.any(np.mod(capacities, 1)) or np.any(np.mod(amounts, 1)):
+        return None, 'non-integral', 'capacities or demands are not whole numbers'
+    
+    flows = {}
+    for k_idx, k in enumerate(COMMODITIES):
         origin, destination, amount = demand[k]
-        print(f"  {k:8}: {amount:3} units from {origin} to {destination}")
+        G = nx.DiGraph()
+        G.add_node(origin, demand=-int(amount))
+        G.add_node(destination, demand=int(amount))
+        for a_idx, (i,j) in enumerate(ARCS):
+            cap = int(capacities[a_idx])
+            # Network simplex needs integer weights: keep 6 decimal places
+            G.add_edge(i, j, capacity=min(cap, ARC_LIMITS.get((k,i,j), cap)),
+                       weight=round(costs[k_idx, a_idx] * 1e6))
+        try:
+            flow_dict = nx.min_cost_flow(G)
+        except nx.NetworkXUnfeasible:
+            return None, 'infeasible', f'no feasible routing for {k}'
+        flows.update(((k,i,j), flow_dict[i][j]) for (i,j) in ARCS)
+    
+    # The per-commodity optimum is optimal overall only if shared capacities hold
+    per_arc = np.fromiter((flows[key] for key in _COST_KEYS), dtype=np.float64,
+                          count=len(_COST_KEYS)).reshape(costs.shape).sum(axis=0)
+    over = np.flatnonzero(per_arc > capacities)
+    if over.size:
+        i, j = ARCS[over[0]]
+        return None, 'capacity coupled', f'arc {i} → {j} over capacity'
+    return flows, 'ok', 'optimal'
+
+
+def _price_commodity(k_idx, weights, demand):
+    """
+    Min-cost flow for one commodity under per-arc weights, ignoring the shared
+    capacities (only its own ARC_LIMITS apply). Returns the flow per arc in
+    ARCS order, or None if the commodity cannot be routed.
+    """
+    
+    k = COMMODITIES[k_idx]
+    origin, destination, amount = demand[k]
+    G = nx.DiGraph()
+    G.add_node(origin, demand=-amount)
+    G.add_node(destination, demand=amount)
+    for a_idx, (i,j) in enumerate(ARCS):
+        # Network simplex needs integer weights: keep 6 decimal places
+        G.add_edge(i, j, weight=round(weights[a_idx] * 1e6))
+        if (k,i,j) in ARC_LIMITS:
+            G[i][j]['capacity'] = ARC_LIMITS[k,i,j]
+    try:
+        flow_dict = nx.min_cost_flow(G)
+    except nx.NetworkXUnfeasible:
+        return None
+    return np.array([flow_dict[i][j] for (i,j) in ARCS], dtype=np.float64)
+
+
+def _generate_columns(columns, costs, capacities, demand, overflow, max_iter, tol):
+    """
+    Column generation on the restricted master LP, extending columns in place.
+    
+    The master mixes each commodity's flow patterns (mixing weights sum to 1)
+    within the shared arc capacities, or, with overflow=True, lets each arc
+    exceed its capacity at unit cost. Its capacity duals price the arcs for the
+    next min-cost flow per commodity, and patterns with negative reduced cost
+    are added until none remain. Returns (res, patterns, termination); res is
+    None if a commodity cannot be routed or the loop does not converge.
+    """
+    
+    num_k, num_a = costs.shape
+    for k_idx in range(num_k):
+        if not columns[k_idx]:
+            x = _price_commodity(k_idx, costs[k_idx], demand)
+            if x is None:
+                return None, None, f'no feasible routing for {COMMODITIES[k_idx]}'
+            columns[k_idx].append(x)
+    
+    for _ in range(max_iter):
+        # Restricted master over mixing weights mu (one per column) [+ overflow]
+        patterns = [(k_idx, x) for k_idx in range(num_k) for x in columns[k_idx]]
+        c = [costs[k_idx] @ x for k_idx, x in patterns]
+        A_ub = np.column_stack([x for _, x in patterns])
+        A_eq = np.zeros((num_k, len(patterns)))
+        for col, (k_idx, _) in enumerate(patterns):
+            A_eq[k_idx, col] = 1
+        if overflow:
+            c = np.concatenate([c, np.ones(num_a)])
+            A_ub = np.hstack([A_ub, -np.eye(num_a)])
+            A_eq = np.hstack([A_eq, np.zeros((num_k, num_a))])
+        res = linprog(c, A_ub=A_ub, b_ub=capacities, A_eq=A_eq, b_eq=np.ones(num_k),
+                      bounds=(0, None), method='highs')
+        if res.status != 0:
+            return None, None, res.message
+        
+        # Capacity duals are <= 0 for a minimization; the price is their negative
+        multipliers = -res.ineqlin.marginals
+        convexity_duals = res.eqlin.marginals
+        
+        # Pricing: one independent min-cost flow per commodity
+        added = False
+        for k_idx in range(num_k):
+            weights = costs[k_idx] + multipliers
+            x = _price_commodity(k_idx, weights, demand)
+            if x is None:
+                return None, None, f'no feasible routing for {COMMODITIES[k_idx]}'
+            # A pattern already in the master cannot improve it; comparing
+            # against it guards against rounding in the integer pricing
+            known = any(np.array_equal(x, y) for y in columns[k_idx])
+            if not known and weights @ x - convexity_duals[k_idx] < -tol:
+                columns[k_idx].append(x)
+                added = True
+        if not added:
+            return res, patterns, None
+    return None, None, f'no convergence in {max_iter} iterations'
+
+
+def _solve_decomposition(capacities, costs, demand, max_iter=100, tol=1e-9):
+    """
+    Dantzig-Wolfe decomposition of the multi-commodity LP.
+    
+    Each commodity is priced as an independent min-cost flow at cost plus the
+    master's capacity duals (Lagrange multipliers). Phase 1 prices at zero
+    cost and minimizes total capacity overflow, which either proves the shared
+    capacities cannot be met or yields patterns that mix into a feasible
+    routing; phase 2 starts from those patterns, forbids overflow and
+    minimizes cost. Returns (flows, status, termination).
+    """
+    
+    # Min-cost flow pricing needs whole-number demands
+    if np.any(np.mod([demand[k][2] for k in COMMODITIES], 1)):
+        return None, 'non-integral', 'demands are not whole numbers'
+    
+    num_k, num_a = costs.shape
+    columns = [[] for _ in range(num_k)]
+    
+    res, _, termination = _generate_columns(columns, np.zeros_like(costs, dtype=np.float64),
+                                            capacities, demand, True, max_iter, tol)
+    if res is None:
+        return None, 'error', termination
+    if res.fun > 1e-6:
+        return None, 'infeasible', 'shared arc capacities cannot be met'
+    
+    res, patterns, termination = _generate_columns(columns, costs, capacities, demand,
+                                                   False, max_iter, tol)
+    if res is None:
+        return None, 'error', termination
+    
+    x = np.zeros((num_k, num_a))
+    for mu, (k_idx, pattern) in zip(res.x, patterns):
+        x[k_idx] += mu * pattern
+    flows = {(k,i,j): float(x[k_idx, a])
+             for k_idx, k in enumerate(COMMODITIES) for a, (i,j) in enumerate(ARCS)}
+    return flows, 'ok', 'optimal'
+
+
+@lru_cache(maxsize=None)
+def _od_paths(origin, destination):
+    """Simple origin → destination paths as tuples of arc positions in ARCS."""
+    
+    G = nx.DiGraph(ARCS)
+    return tuple(tuple(_ARC_POS[arc] for arc in nx.utils.pairwise(path))
+                 for path in nx.all_simple_paths(G, origin, destination))
+
+
+def _solve_paths(capacities, costs, demand):
+    """
+    Solve the path-based formulation of the multi-commodity LP.
+    
+    The network has only a handful of simple origin-destination paths, so each
+    variable is the flow of one commodity along one whole path: flow
+    conservation holds by construction and only the demand, shared capacity
+    and commodity arc-limit rows remain. Returns (flows, status, termination).
+    """
     
-    print("\n🛤️  Arc Data (Capacity, Cost_Coal, Cost_Grain, Cost_Sugar):")
-    for arc in arcs:
-        cap, c_coal, c_grain, c_sugar = arc_data[arc]
-        print(f"  {arc[0]} → {arc[1]}: capacity={cap:3}, coal_cost=${c_coal}, grain_cost=${c_grain}, cost_sugar=${c_sugar}")
+    num_k, num_a = costs.shape
+    
+    # One column per (commodity, path): its arc-incidence vector
+    owners, patterns = [], []
+    for k_idx, k in enumerate(COMMODITIES):
+        origin, destination, amount = demand[k]
+        paths = _od_paths(origin, destination)
+        if not paths:
+            return None, 'infeasible', f'no path from {origin} to {destination} for {k}'
+        for path in paths:
+            x = np.zeros(num_a)
+            x[list(path)] = 1
+            owners.append(k_idx)
+            patterns.append(x)
+    owners = np.array(owners)
+    P = np.column_stack(patterns)
+    
+    # Each commodity's path flows add up to its demand
+    A_eq = (owners == np.arange(num_k)[:, None]).astype(np.float64)
+    b_eq = [demand[k][2] for k in COMMODITIES]
+    
+    # Shared arc capacities, then commodity-specific arc limits
+    A_ub = [P] + [P[_ARC_POS[i,j]] * (owners == COMMODITIES.index(k))
+                  for (k,i,j) in ARC_LIMITS]
+    b_ub = np.concatenate([capacities, list(ARC_LIMITS.values())])
+    
+    c = (costs[owners] * P.T).sum(axis=1)
+    res = linprog(c, A_ub=np.vstack(A_ub), b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                  bounds=(0, None), method='highs')
+    if res.status != 0:
+        return None, 'error', res.message
+    
+    x = np.zeros((num_k, num_a))
+    np.add.at(x, owners, res.x[:, None] * P.T)
+    flows = dict(zip(_COST_KEYS, x.ravel().tolist()))
+    return flows, 'ok', 'optimal'
+
+
+def _auto_method():
+    """
+    Choose the backend for method='auto' from the problem size alone.
+    
+    Small instances go to linprog, which skips the one-off Pyomo build; its
+    dense (commodity x node) by (commodity x arc) matrices grow quadratically,
+    so larger instances use the Pyomo model instead.
+    """
+    
+    return 'linprog' if len(_COST_KEYS) <= AUTO_DENSE_MAX_VARS else 'pyomo'
+
+
+def solve_railway_routing(capacities=None, costs=None, demand=None, method='pyomo',
+                          verbose=True):
+    """
+    Solve simplified multi-commodity railway routing problem.
+    
+    Args:
+        capacities: Optional per-arc capacities (ARCS order) replacing CAPACITIES
+        costs: Optional (commodity x arc) unit costs replacing COSTS
+        demand: Optional {commodity: (origin, destination, amount)} overrides
+                applied on top of DEMAND
+        method: 'pyomo' (LP), 'linprog' (dense scipy LP), 'networkx'
+                (per-commodity min-cost flow, falling back to the LP with a
+                warning when it cannot prove optimality) or 'decomposition'
+                (Dantzig-Wolfe over per-commodity min-cost flows) or
+                'paths' (LP over whole origin-destination paths) or 'auto'
+                (linprog up to AUTO_DENSE_MAX_VARS flow variables,
+                Pyomo beyond)
+        verbose: Print the problem setup and solution report; pass False
+                 to skip all formatting when solving many scenarios
+    
+    Returns:
+        dict: {(commodity, i, j): units} optimal flows, or None if not solved
+    
+    Raises:
+        ValueError: If method is not one of the names above
+    """
+    
+    if method not in _METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {', '.join(_METHODS)}")
+    
+    capacities = CAPACITIES if capacities is None else np.asarray(capacities)
+    costs = COSTS if costs is None else np.asarray(costs)
+    demand = {**DEMAND, **(demand or {})}
+    
+    # Display problem setup
+    if verbose:
+        lines = ["=" * 70, "SIMPLIFIED RAILWAY ROUTING - MULTI-COMMODITY FLOW", "=" * 70,
+                 "\n📊 Network Topology:", "    A → B → E", "    ↓   ↓", "    C → D -> E",
+                 "\n🚂 Freight Demand:"]
+        lines.extend(f"  {k:8}: {demand[k][2]:3} units from {demand[k][0]} to {demand[k][1]}"
+                     for k in COMMODITIES)
+        lines.append("\n🛤️  Arc Data (Capacity, Cost_Coal, Cost_Grain, Cost_Sugar):")
+        for a_idx, arc in enumerate(ARCS):
+            cap = capacities[a_idx]
+            c_coal, c_grain, c_sugar = costs[:, a_idx]
+            lines.append(f"  {arc[0]} → {arc[1]}: capacity={cap:3}, coal_cost=${c_coal}, grain_cost=${c_grain}, cost_sugar=${c_sugar}")
+        lines.append("\n⚙️  Solving optimization problem...")
+        print("\n".join(lines))
     
     # Solve
-    print("\n⚙️  Solving optimization problem...")
-    solver = SolverFactory('glpk')
-    result = solver.solve(model, tee=False)
+    lines = []
+    if method == 'auto':
+        method = _auto_method()
+        lines.append(f"↪ Auto-selected method: {method}")
+    if method == 'networkx':
+        flows, status, termination = _solve_networkx(capacities, costs, demand)
+        if flows is None:
+            # Warn regardless of verbose: the flows come from another backend
+            warnings.warn(f"NetworkX min-cost flow: {termination}; solving the LP instead",
+                          stacklevel=2)
+            flows, status, termination = _solve_pyomo(capacities, costs, demand)
+    elif method == 'linprog':
+        flows, status, termination = _solve_linprog(capacities, costs, demand)
+    elif method == 'decomposition':
+        flows, status, termination = _solve_decomposition(capacities, costs, demand)
+        if status == 'non-integral':
+            warnings.warn(f"Decomposition: {termination}; solving the LP instead",
+                          stacklevel=2)
+            flows, status, termination = _solve_pyomo(capacities, costs, demand)
+    elif method == 'paths':
+        flows, status, termination = _solve_paths(capacities, costs, demand)
+    else:
+        flows, status, termination = _solve_pyomo(capacities, costs, demand)
+    
+    if not verbose:
+        return flows
     
     # Check solver status
-    if result.solver.status == SolverStatus.ok and \
-       result.solver.termination_condition == TerminationCondition.optimal:
-        print("✓ Optimal solution found!\n")
+    if flows is not None:
+        lines.append("✓ Optimal solution found!\n")
+        
+        # Harvest flows once as a (commodity x arc) array; costs follow by
+        # elementwise product
+        flow_arr = np.fromiter((flows[key] for key in _COST_KEYS), dtype=np.float64,
+                               count=len(_COST_KEYS)).reshape(costs.shape)
+        arc_costs = costs * flow_arr
+        shown = flow_arr > 0.01
+        routed = np.where(shown, flow_arr, 0).sum(axis=1)
         
-        print(f"💰 Optimal Total Cost: ${model.obj():.2f}\n")
+        lines.append(f"💰 Optimal Total Cost: ${arc_costs.sum():.2f}\n")
         
         # Display routing for each commodity
-        for k in model.Commodities:
-            print(f"🔹 {k} Routing:")
-            total_flow = 0
-            for (i,j) in model.Arcs:
-                flow_val = model.flow[k,i,j].value
-                if flow_val > 0.01:
-                    cost = model.cost[k,i,j] * flow_val
-                    total_flow += flow_val
-                    print(f"    {i} → {j}: {flow_val:5.1f} units " + 
-                          f"(unit cost=${model.cost[k,i,j]}, total=${cost:.2f})")
-            origin, destination, amount = demand[k]
-            print(f"  Total routed: {total_flow:.1f} / {amount} units\n")
+        for k_idx, k in enumerate(COMMODITIES):
+            lines.append(f"🔹 {k} Routing:")
+            for a_idx in np.flatnonzero(shown[k_idx]):
+                i, j = ARCS[a_idx]
+                lines.append(f"    {i} → {j}: {flow_arr[k_idx, a_idx]:5.1f} units " + 
+                             f"(unit cost=${costs[k_idx, a_idx]}, total=${arc_costs[k_idx, a_idx]:.2f})")
+            lines.append(f"  Total routed: {routed[k_idx]:.1f} / {demand[k][2]} units\n")
         
-        # Display arc utilization
-        print("📈 Arc Utilization:")
-        for (i,j) in model.Arcs:
-            total_flow = sum(model.flow[k,i,j].value for k in model.Commodities)
-            capacity = model.capacity[i,j]
-            utilization = (total_flow / capacity) * 100
-            bar_length = int(utilization / 5)
-            bar = "█" * bar_length + "░" * (20 - bar_length)
-            print(f"  {i} → {j}: [{bar}] {total_flow:5.1f}/{capacity:3} ({utilization:5.1f}%)")
+        # Display arc utilization, computed for all arcs at once
+        per_arc = flow_arr.sum(axis=0)
+        util = per_arc / capacities * 100
+        bar_len = np.clip(util // 5, 0, 20).astype(int)
+        lines.append("📈 Arc Utilization:")
+        for a_idx, (i,j) in enumerate(ARCS):
+            bar = _BARS[bar_len[a_idx]]
+            lines.append(f"  {i} → {j}: [{bar}] {per_arc[a_idx]:5.1f}/{capacities[a_idx]:3} ({util[a_idx]:5.1f}%)")
         
     else:
-        print("✗ Solver failed to find optimal solution")
-        print(f"Status: {result.solver.status}")
-        print(f"Termination: {result.solver.termination_condition}")
+        lines.extend(["✗ Solver failed to find optimal solution",
+                      f"Status: {status}",
+                      f"Termination: {termination}"])
     
-    print("\n" + "=" * 70 + "\n")
+    lines.append("\n" + "=" * 70 + "\n")
+    print("\n".join(lines))
     
-    return model
+    return flows
 
 if __name__ == "__main__":
-    model = solve_railway_routing()
+    flows = solve_railway_routing()
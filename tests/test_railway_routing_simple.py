@@ -0,0 +1,61 @@
+"""
+Cross-check every solve_railway_routing backend against the dense linprog LP.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.optimization import railway_routing_simple as routing
+
+SCENARIOS = {
+    'default': ({}, 1490.0),
+    'fractional': (dict(capacities=[100.5, 60, 100, 150, 60.25, 150],
+                        costs=routing.COSTS + np.array([0.5, 0, 0.25, 0, 0, 0]),
+                        demand={'Sugar': ('A', 'E', 60.5)}), 1545.25),
+    'other_origin': (dict(demand={'Coal': ('B', 'E', 50), 'Grain': ('C', 'E', 40)}), 1150.0),
+    'infeasible_demand': (dict(demand={'Grain': ('A', 'E', 500)}), None),
+}
+
+
+def _total_cost(flows, costs):
+    if flows is None:
+        return None
+    return sum(c * flows[key] for key, c in zip(routing._COST_KEYS, np.ravel(costs)))
+
+
+# networkx and decomposition warn when they hand the problem to the LP
+@pytest.mark.filterwarnings("ignore:.*solving the LP instead:UserWarning")
+@pytest.mark.parametrize("method", routing._METHODS)
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_method_matches_linprog(method, scenario):
+    kwargs, expected = SCENARIOS[scenario]
+    costs = kwargs.get('costs', routing.COSTS)
+
+    reference = routing.solve_railway_routing(method='linprog', verbose=False, **kwargs)
+    flows = routing.solve_railway_routing(method=method, verbose=False, **kwargs)
+
+    if expected is None:
+        assert reference is None and flows is None
+    else:
+        assert _total_cost(reference, costs) == pytest.approx(expected)
+        assert _total_cost(flows, costs) == pytest.approx(expected)
+
+
+def test_od_paths_cover_default_network():
+    paths = {tuple(routing.ARCS[a] for a in path) for path in routing._od_paths('A', 'E')}
+    assert paths == {
+        (('A', 'B'), ('B', 'E')),
+        (('A', 'B'), ('B', 'D'), ('D', 'E')),
+        (('A', 'C'), ('C', 'D'), ('D', 'E')),
+    }
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="linporg"):
+        routing.solve_railway_routing(method='linporg', verbose=False)